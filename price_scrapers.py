@@ -3,13 +3,51 @@
 import asyncio
 import logging
 import re
-from typing import Optional, Dict, Any, List
-from playwright.async_api import async_playwright, Browser
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Awaitable
+from playwright.async_api import async_playwright, Browser, Playwright
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a single synchronous lookup before giving up
+SYNC_TIMEOUT = 60
+
+# Maximum number of pages scraped at once by the bulk sync wrapper
+BULK_CONCURRENCY = 8
+
+# Seconds a successful live price is reused before the product is scraped again
+PRICE_CACHE_TTL = 300
+
+# Persistent event loop for the synchronous wrappers. It runs in a daemon
+# thread so the shared browser survives between Streamlit reruns and the
+# launch cost is paid once instead of on every call.
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name='price-scraper-loop', daemon=True).start()
+
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+_browser_lock = asyncio.Lock()
+
+# Cookies/local storage captured after the first successful scrape per store,
+# replayed into new contexts so warm runs skip consent and anti-bot handshakes
+_storage_state_by_store: Dict[str, Dict[str, Any]] = {}
+
+# Successful results keyed by (product_url, store), with the time they were
+# scraped, so repeated clicks within PRICE_CACHE_TTL don't open new pages
+_price_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_price_cache_lock = threading.Lock()
+
+# Price formats accepted by the Woolworths fallback search, handling commas and high prices
+WOOLWORTHS_PRICE_PATTERNS = [
+    re.compile(r'\$(\d{1,3}(?:,\d{3})*\.\d{2})'),  # $1,234.56
+    re.compile(r'\$(\d{1,3}(?:,\d{3})*)'),         # $1,234
+    re.compile(r'\$(\d+\.\d{2})'),                 # $12.34
+    re.compile(r'\$(\d+)')                         # $12
+]
+
 class PriceScraperError(Exception):
     """Custom exception for price scraping errors"""
     pass
@@ -39,7 +77,8 @@ async def scrape_iga_product_price(browser: Browser, product_url: str) -> Dict[s
         
         # Create new page from shared browser
         context = await browser.new_context(
-            user_agent='Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0',
+            storage_state=_storage_state_by_store.get('IGA'),
+            user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             viewport={'width': 1366, 'height': 768},
             locale='en-AU',
             timezone_id='Australia/Sydney',
@@ -107,6 +146,7 @@ async def scrape_iga_product_price(browser: Browser, product_url: str) -> Dict[s
             result['status'] = 'success'
             result['message'] = 'Price successfully scraped'
             logger.info(f"✅ IGA price found: {price_text.strip()}")
+            await remember_storage_state('IGA', context)
         else:
             result['message'] = 'Price element not found on page'
             
@@ -321,6 +361,7 @@ async def scrape_coles_product_price(browser: Browser, product_url: str) -> Dict
         
         # Create new context and page from shared browser
         context = await browser.new_context(
+            storage_state=_storage_state_by_store.get('Coles'),
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             viewport={'width': 1366, 'height': 768},
             locale='en-AU',
@@ -480,6 +521,7 @@ async def scrape_coles_product_price(browser: Browser, product_url: str) -> Dict
                 result['status'] = 'success'
                 result['message'] = 'Price successfully scraped'
                 logger.info(f"✅ Coles price found: ${cleaned_price}")
+                await remember_storage_state('Coles', context)
             else:
                 result['message'] = f'Could not parse price from text: {price_text}'
         else:
@@ -533,7 +575,8 @@ async def scrape_woolworths_product_price(browser: Browser, product_url: str) ->
         
         # Create new context and page from shared browser
         context = await browser.new_context(
-            user_agent='Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0',
+            storage_state=_storage_state_by_store.get('Woolworths'),
+            user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             viewport={'width': 1366, 'height': 768},
             locale='en-AU',
             timezone_id='Australia/Sydney',
@@ -546,12 +589,20 @@ async def scrape_woolworths_product_price(browser: Browser, product_url: str) ->
         
         page = await context.new_page()
         
-        # Single navigation strategy - no fallbacks needed
-        await page.goto(product_url, wait_until='domcontentloaded', timeout=20000)
-        
-        # Minimal wait time
-        await asyncio.sleep(2)
-        
+        # Return as soon as the response starts streaming - the price markup is
+        # server-rendered, so there's no need to wait for DOMContentLoaded
+        await page.goto(product_url, wait_until='commit', timeout=15000)
+
+        # Probe the DOM until either the price or the JSON-LD product data shows up
+        try:
+            await page.wait_for_function(
+                "document.querySelector('.product-price_component_price-lead__vlm8f')"
+                " || document.querySelector('script[type=\"application/ld+json\"]')",
+                timeout=8000
+            )
+        except Exception as e:
+            logger.debug(f"Woolworths DOM probe timed out: {e}")
+
         # Direct price extraction - use the exact selector we know works
         price_text = None
         
@@ -569,37 +620,20 @@ async def scrape_woolworths_product_price(browser: Browser, product_url: str) ->
         except Exception:
             pass
         
-        # Fallback strategy: Simple price search (limited scope)
+        # Fallback strategy: let the browser pick out short "$" text nodes in one round trip
         if not price_text:
             try:
-                # Look for any price element in reasonable range - limit search
-                all_prices = await page.query_selector_all('span, div')
-                for element in all_prices[:20]:  # Limit search to first 20 elements
-                    text = await element.text_content()
-                    if text and '$' in text and len(text) < 25:  # Increased length for high prices
-                        import re
-                        # Updated regex to handle commas and high prices
-                        price_patterns = [
-                            r'\$(\d{1,3}(?:,\d{3})*\.\d{2})',  # $1,234.56
-                            r'\$(\d{1,3}(?:,\d{3})*)',         # $1,234
-                            r'\$(\d+\.\d{2})',                 # $12.34
-                            r'\$(\d+)'                         # $12
-                        ]
-                        
-                        for pattern in price_patterns:
-                            price_match = re.search(pattern, text)
-                            if price_match:
-                                try:
-                                    # Just check if we can extract the price text
-                                    price_text = text.strip()
-                                    logger.info(f"✅ Found fallback price: {price_text}")
-                                    break
-                                except ValueError:
-                                    continue
-                        if price_text:  # Break outer loop if price found
-                            break
-            except Exception:
-                pass
+                candidates = await page.eval_on_selector_all(
+                    "xpath=//*[self::span or self::div][contains(., '$')]",
+                    "els => els.map(e => e.textContent.trim()).filter(t => t.length < 25).slice(0, 30)"
+                )
+                for text in candidates:
+                    if any(pattern.search(text) for pattern in WOOLWORTHS_PRICE_PATTERNS):
+                        price_text = text
+                        logger.info(f"✅ Found fallback price: {price_text}")
+                        break
+            except Exception as e:
+                logger.debug(f"Woolworths fallback search failed: {e}")
         
         # Parse result
         if price_text:
@@ -608,6 +642,7 @@ async def scrape_woolworths_product_price(browser: Browser, product_url: str) ->
             result['status'] = 'success'
             result['message'] = 'Price successfully scraped'
             logger.info(f"✅ Woolworths price found: {price_text.strip()}")
+            await remember_storage_state('Woolworths', context)
         else:
             result['message'] = 'Price element not found'
             
@@ -623,6 +658,54 @@ async def scrape_woolworths_product_price(browser: Browser, product_url: str) ->
     
     return result
 
+async def remember_storage_state(store: str, context) -> None:
+    """
+    Capture a context's cookies and storage the first time a store scrape succeeds.
+    
+    Args:
+        store: The store name used as the cache key
+        context: BrowserContext that produced the successful scrape
+    """
+    if store in _storage_state_by_store:
+        return
+    
+    try:
+        _storage_state_by_store[store] = await context.storage_state()
+        logger.info(f"🍪 Cached session state for {store}")
+    except Exception as e:
+        logger.debug(f"Could not capture {store} session state: {e}")
+
+async def wait_for_first_visible(page, selectors: List[str], timeout: int = 2000):
+    """
+    Wait for several selectors in parallel and return the first visible match.
+    
+    Args:
+        page: Playwright Page to search
+        selectors: Candidate selectors
+        timeout: Milliseconds to wait for any selector to become visible
+        
+    Returns:
+        Tuple of (selector, element), or (None, None) if nothing became visible
+    """
+    tasks = {
+        asyncio.create_task(page.wait_for_selector(selector, timeout=timeout, state='visible')): selector
+        for selector in selectors
+    }
+    pending = set(tasks)
+    
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result():
+                    return tasks[task], task.result()
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+        # Retrieve results so failed waits don't log "exception never retrieved"
+        await asyncio.gather(*tasks, return_exceptions=True)
+
 async def handle_iga_modal(page):
     """Handle IGA welcome modal or guest browsing popup"""
     try:
@@ -644,17 +727,12 @@ async def handle_iga_modal(page):
             'a:has-text("Guest")'
         ]
         
-        for selector in guest_selectors:
-            try:
-                element = await page.wait_for_selector(selector, timeout=2000)
-                if element and await element.is_visible():
-                    await element.click()
-                    logger.info(f"✅ Clicked guest button: {selector}")
-                    modal_handled = True
-                    await page.wait_for_timeout(2000)
-                    break
-            except Exception:
-                continue
+        selector, element = await wait_for_first_visible(page, guest_selectors)
+        if element:
+            await element.click()
+            logger.info(f"✅ Clicked guest button: {selector}")
+            modal_handled = True
+            await page.wait_for_timeout(2000)
         
         # Strategy 2: Try to close modal with close buttons
         if not modal_handled:
@@ -670,17 +748,12 @@ async def handle_iga_modal(page):
                 'button[class*="close"]'
             ]
             
-            for selector in close_selectors:
-                try:
-                    element = await page.wait_for_selector(selector, timeout=2000)
-                    if element and await element.is_visible():
-                        await element.click()
-                        logger.info(f"✅ Closed modal with: {selector}")
-                        modal_handled = True
-                        await page.wait_for_timeout(1000)
-                        break
-                except Exception:
-                    continue
+            selector, element = await wait_for_first_visible(page, close_selectors)
+            if element:
+                await element.click()
+                logger.info(f"✅ Closed modal with: {selector}")
+                modal_handled = True
+                await page.wait_for_timeout(1000)
         
         # Strategy 3: Try pressing Escape key
         if not modal_handled:
@@ -724,17 +797,12 @@ async def handle_woolworths_modal(page):
             '.close'
         ]
         
-        for selector in close_selectors:
-            try:
-                element = await page.wait_for_selector(selector, timeout=2000)
-                if element and await element.is_visible():
-                    await element.click()
-                    logger.info(f"✅ Closed Woolworths modal with: {selector}")
-                    modal_handled = True
-                    await page.wait_for_timeout(1000)
-                    break
-            except Exception:
-                continue
+        selector, element = await wait_for_first_visible(page, close_selectors)
+        if element:
+            await element.click()
+            logger.info(f"✅ Closed Woolworths modal with: {selector}")
+            modal_handled = True
+            await page.wait_for_timeout(1000)
         
         # Strategy 2: Try pressing Escape
         if not modal_handled:
@@ -754,16 +822,11 @@ async def handle_woolworths_modal(page):
             'button[class*="accept"]'
         ]
         
-        for selector in privacy_selectors:
-            try:
-                element = await page.wait_for_selector(selector, timeout=2000)
-                if element and await element.is_visible():
-                    await element.click()
-                    logger.info(f"✅ Accepted cookies with: {selector}")
-                    await page.wait_for_timeout(1000)
-                    break
-            except Exception:
-                continue
+        selector, element = await wait_for_first_visible(page, privacy_selectors)
+        if element:
+            await element.click()
+            logger.info(f"✅ Accepted cookies with: {selector}")
+            await page.wait_for_timeout(1000)
                 
     except Exception as e:
         logger.debug(f"Woolworths modal handling completed: {e}")
@@ -865,61 +928,128 @@ async def get_live_price(browser: Browser, product_url: str, store: str) -> Dict
             'store': store
         }
 
-async def scrape_prices_concurrently(urls_and_stores: List[tuple]) -> List[Dict[str, Any]]:
+async def launch_browser(playwright: Playwright) -> Browser:
     """
-    Scrape multiple product prices concurrently using a single shared browser.
+    Launch a headless browser configured for price scraping.
     
     Args:
-        urls_and_stores: List of (product_url, store_name) tuples
+        playwright: Running Playwright instance
         
     Returns:
-        List of dictionaries containing price and status information
+        Launched Browser instance
+    """
+    return await playwright.chromium.launch(
+        headless=True,
+        args=[
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-blink-features=AutomationControlled',
+            '--disable-gpu',
+            '--disable-extensions',
+            '--no-first-run',
+            '--disable-background-timer-throttling',
+            '--disable-renderer-backgrounding'
+        ]
+    )
+
+async def get_shared_browser() -> Browser:
+    """
+    Return the persistent browser, launching it on first use.
+    
+    Must be awaited on the persistent scraper loop.
+    
+    Returns:
+        Shared Browser instance
+    """
+    global _playwright, _browser
+    
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await launch_browser(_playwright)
+            logger.info("🚀 Shared browser launched")
+    
+    return _browser
+
+async def get_live_price_async(product_url: str, store: str) -> Dict[str, Any]:
+    """
+    Get live price for a product using the persistent shared browser.
+    
+    Args:
+        product_url: The product URL
+        store: The store name ('Coles', 'IGA', 'Woolworths')
+        
+    Returns:
+        Dict containing price and status information
+    """
+    browser = await get_shared_browser()
+    return await get_live_price(browser, product_url, store)
+
+async def scrape_prices_as_completed(urls_and_stores: List[tuple]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Scrape multiple product prices concurrently, yielding each result as soon as it finishes.
+    
+    Args:
+        urls_and_stores: List of (product_url, store_name) tuples
+        
+    Yields:
+        (index, result) tuples in completion order, where index is the position
+        of the URL in urls_and_stores
     """
     async with async_playwright() as p:
         # Launch a single browser instance
-        browser = await p.firefox.launch(
-            headless=True,
-            args=[
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--ignore-certificate-errors'
-            ]
-        )
+        browser = await launch_browser(p)
+        
+        async def scrape_one(index: int, product_url: str, store: str) -> Tuple[int, Dict[str, Any]]:
+            try:
+                return index, await get_live_price(browser, product_url, store)
+            except Exception as e:
+                return index, {
+                    'price': None,
+                    'currency': '$',
+                    'status': 'error',
+                    'message': f'Exception during scraping: {str(e)}',
+                    'store': store
+                }
+        
+        # Create tasks for concurrent execution
+        tasks = [
+            asyncio.create_task(scrape_one(i, product_url, store))
+            for i, (product_url, store) in enumerate(urls_and_stores)
+        ]
         
         try:
-            # Create tasks for concurrent execution
-            tasks = []
-            for product_url, store in urls_and_stores:
-                task = get_live_price(browser, product_url, store)
-                tasks.append(task)
-            
-            # Execute all tasks concurrently
             logger.info(f"🚀 Starting concurrent scraping of {len(tasks)} URLs...")
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle any exceptions that occurred
-            processed_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    processed_results.append({
-                        'price': None,
-                        'currency': '$',
-                        'status': 'error',
-                        'message': f'Exception during scraping: {str(result)}',
-                        'store': urls_and_stores[i][1]
-                    })
-                else:
-                    processed_results.append(result)
-            
-            return processed_results
-            
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+                
         finally:
+            # Don't leave scrapes running if the caller stopped consuming early
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
             # Always close the browser
             await browser.close()
             logger.info("🔒 Browser closed successfully")
 
+async def scrape_prices_concurrently(urls_and_stores: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Scrape multiple product prices concurrently using a single shared browser.
+    
+    Args:
+        urls_and_stores: List of (product_url, store_name) tuples
+        
+    Returns:
+        List of dictionaries containing price and status information,
+        in the same order as urls_and_stores
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(urls_and_stores)
+    async for index, result in scrape_prices_as_completed(urls_and_stores):
+        results[index] = result
+    return results
+
 async def main_concurrent_scraper(urls_and_stores: List[tuple]) -> List[Dict[str, Any]]:
     """
     Main entry point for concurrent price scraping.
@@ -932,12 +1062,71 @@ async def main_concurrent_scraper(urls_and_stores: List[tuple]) -> List[Dict[str
     """
     return await scrape_prices_concurrently(urls_and_stores)
 
+async def gather_limited(coros: List[Awaitable], limit: int = BULK_CONCURRENCY) -> List[Any]:
+    """
+    Run coroutines concurrently with at most `limit` in flight at once.
+    
+    Args:
+        coros: Coroutines to run
+        limit: Maximum number running at the same time
+        
+    Returns:
+        List of results in input order; exceptions are returned, not raised
+    """
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def run(coro: Awaitable) -> Any:
+        async with semaphore:
+            return await coro
+    
+    return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=True)
+
+def get_cached_price(product_url: str, store: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a live price scraped within the last PRICE_CACHE_TTL seconds.
+    
+    Args:
+        product_url: The product URL
+        store: The store name
+        
+    Returns:
+        The cached result dict, or None if there is no fresh entry
+    """
+    with _price_cache_lock:
+        entry = _price_cache.get((product_url, store))
+        if entry is None:
+            return None
+        scraped_at, result = entry
+        if time.monotonic() - scraped_at > PRICE_CACHE_TTL:
+            del _price_cache[(product_url, store)]
+            return None
+        return result
+
+def cache_price(product_url: str, store: str, result: Dict[str, Any]) -> None:
+    """
+    Remember a scrape result; only successes are cached so failures are retried.
+    
+    Args:
+        product_url: The product URL
+        store: The store name
+        result: Dict returned by the scraper
+    """
+    if result.get('status') == 'success':
+        with _price_cache_lock:
+            _price_cache[(product_url, store)] = (time.monotonic(), result)
+
+def clear_price_cache() -> None:
+    """Forget all cached live prices so the next lookup scrapes again."""
+    with _price_cache_lock:
+        _price_cache.clear()
+
 # Synchronous wrapper for Streamlit (backward compatibility)
 def get_live_price_sync(product_url: str, store: str) -> Dict[str, Any]:
     """
     Synchronous wrapper for get_live_price to use in Streamlit.
-    Note: This creates a new browser instance for each call and is slower.
-    For better performance, use the concurrent scraper functions.
+    Runs on the persistent scraper loop and reuses the shared browser,
+    so only the first call pays the browser launch cost. Prices scraped
+    within PRICE_CACHE_TTL seconds are returned without scraping again.
     
     Args:
         product_url: The product URL
@@ -946,22 +1135,25 @@ def get_live_price_sync(product_url: str, store: str) -> Dict[str, Any]:
     Returns:
         Dict containing price and status information
     """
+    cached = get_cached_price(product_url, store)
+    if cached is not None:
+        return cached
+    
+    future = asyncio.run_coroutine_threadsafe(
+        get_live_price_async(product_url, store), _loop
+    )
+    
     try:
-        # Create new event loop for this function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Use the concurrent scraper for a single URL
-        result = loop.run_until_complete(
-            scrape_prices_concurrently([(product_url, store)])
-        )
-        loop.close()
-        
-        return result[0] if result else {
+        result = future.result(timeout=SYNC_TIMEOUT)
+        cache_price(product_url, store, result)
+        return result
+    except TimeoutError:
+        future.cancel()
+        return {
             'price': None,
             'currency': '$',
             'status': 'error',
-            'message': 'No result returned',
+            'message': f'Timed out after {SYNC_TIMEOUT} seconds',
             'store': store
         }
     except Exception as e:
@@ -973,9 +1165,63 @@ def get_live_price_sync(product_url: str, store: str) -> Dict[str, Any]:
             'store': store
         }
 
-if __name__ == "__main__":
-    import time
+def get_live_prices_sync(urls_and_stores: List[tuple], limit: int = BULK_CONCURRENCY) -> List[Dict[str, Any]]:
+    """
+    Synchronous bulk wrapper for Streamlit: scrape many products concurrently on the shared browser.
+    
+    Args:
+        urls_and_stores: List of (product_url, store_name) tuples
+        limit: Maximum number of pages scraped at once
+        
+    Returns:
+        List of dictionaries containing price and status information,
+        in the same order as urls_and_stores
+    """
+    if not urls_and_stores:
+        return []
+    
+    # Serve fresh cached prices and scrape each remaining product only once,
+    # even if it appears several times in the request
+    results_by_target = {}
+    pending = []
+    for target in urls_and_stores:
+        if target in results_by_target:
+            continue
+        cached = get_cached_price(*target)
+        results_by_target[target] = cached
+        if cached is None:
+            pending.append(target)
+    
+    if pending:
+        coros = [get_live_price_async(product_url, store) for product_url, store in pending]
+        future = asyncio.run_coroutine_threadsafe(gather_limited(coros, limit), _loop)
+        
+        # Allow one single-lookup timeout per batch of `limit` pages
+        batches = -(-len(pending) // limit)
+        try:
+            results = future.result(timeout=SYNC_TIMEOUT * batches)
+        except TimeoutError:
+            future.cancel()
+            results = [TimeoutError(f'Timed out after {SYNC_TIMEOUT * batches} seconds')] * len(pending)
+        except Exception as e:
+            results = [e] * len(pending)
+        
+        for (product_url, store), result in zip(pending, results):
+            if isinstance(result, Exception):
+                result = {
+                    'price': None,
+                    'currency': '$',
+                    'status': 'error',
+                    'message': f'Error running async scraper: {str(result)}',
+                    'store': store
+                }
+            else:
+                cache_price(product_url, store, result)
+            results_by_target[(product_url, store)] = result
     
+    return [results_by_target[target] for target in urls_and_stores]
+
+if __name__ == "__main__":
     # Sample URLs for demonstration
     sample_urls_and_stores = [
         # IGA URLs
@@ -1,3 +1,2 @@
 #!/bin/bash
-playwright install firefox
 playwright install chromium
\ No newline at end of file
@@ -2,19 +2,14 @@ import os
 import subprocess
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
-import requests
-from io import BytesIO
-import re
+import numpy as np
+import html
 import asyncio
 import threading
 import time
 import glob
-from pathlib import Path
-import math
-from price_scrapers import get_live_price_sync
+from concurrent.futures import ThreadPoolExecutor
+from price_scrapers import get_live_prices_sync, clear_price_cache
 
 # Page configuration
 st.set_page_config(
@@ -24,8 +19,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
+# Custom CSS, minified once at import since it is re-sent on every run
+CUSTOM_CSS = " ".join("""
 <style>
     .main-header {
         background: linear-gradient(135deg, #E50000, #FF6B35);
@@ -54,262 +49,377 @@ st.markdown("""
         color: white;
     }
     .product-card {
-        border: 1px solid #ddd;
+        border: 1px solid rgba(128, 128, 128, 0.3);
         border-radius: 10px;
         padding: 1rem;
         margin: 0.5rem 0;
-        background-color: white;
+        background-color: rgba(128, 128, 128, 0.08);
+        display: flex;
+        align-items: center;
+        gap: 1rem;
+    }
+    .product-card .product-image {
+        flex: 1;
+    }
+    .product-card .product-info {
+        flex: 4;
+    }
+    .product-card .product-info h4 {
+        margin: 0;
+    }
+    .product-card .product-info p {
+        margin: 0.25rem 0;
+    }
+    .product-card .product-price {
+        flex: 1;
+    }
+    .product-card .price-value {
+        font-size: 1.75rem;
+    }
+    .product-card .live-price {
+        font-size: 0.8rem;
+        color: #808495;
+    }
+    .product-card .product-link {
+        flex: 1;
+    }
+    .store-badge {
+        color: white;
+        padding: 0.25rem 0.75rem;
+        border-radius: 15px;
+        font-size: 0.8rem;
+        font-weight: bold;
     }
 </style>
-""", unsafe_allow_html=True)
+""".split())
+
+# Standard columns every store frame is normalized to, with the value used
+# when a store's CSV doesn't provide the column
+COLUMN_DEFAULTS = {
+    'product_name': 'Unknown Product',
+    'price': 'Price not available',
+    'brand': 'Various',
+    'image_url': None,
+    'product_url': None,
+    'category': 'General'
+}
+
+# Per-store source column names for the standard columns
+STORE_RENAME = {
+    'IGA': {'title': 'product_name', 'productUrl': 'product_url', 'imageUrl': 'image_url'},
+    'Woolworths': {'title': 'product_name', 'producturl': 'product_url', 'imageurl': 'image_url'},
+    'Coles': {'name': 'product_name', 'productURL': 'product_url', 'imageURL': 'image_url'}
+}
+
+# Raw CSV columns the loader maps onto the standard columns; anything else a
+# scraper wrote (ids, subcategories, ...) is never parsed
+SOURCE_COLUMNS = {
+    'title', 'name', 'price', 'brand', 'category',
+    'productUrl', 'producturl', 'productURL', 'product_url',
+    'imageUrl', 'imageurl', 'imageURL', 'image_url'
+}
+
+# Brand color for each store's badge
+STORE_COLORS = {
+    'Coles': '#E50000',
+    'IGA': '#00A651',
+    'Woolworths': '#FF6B35'
+}
+
+# Finished store badge markup, built once at import
+BADGE_HTML = {
+    store: f"<span class='store-badge' style='background-color: {color};'>{store}</span>"
+    for store, color in STORE_COLORS.items()
+}
+
+# The known stores as a fixed categorical dtype: the store column holds one
+# small code per row, and its categories match the BADGE_HTML keys
+STORE_DTYPE = pd.CategoricalDtype(list(STORE_COLORS))
+
+def scan_csv_files(root: str):
+    """Yield every CSV path under root, files before subfolders, from os.scandir's cached entries"""
+    subfolders = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+            elif entry.name.endswith('.csv') and entry.is_file(follow_symlinks=False):
+                yield entry.path
+    for subfolder in subfolders:
+        yield from scan_csv_files(subfolder)
 
 @st.cache_data
 def discover_csv_files():
     """Discover all CSV files in store folders"""
     csv_files = {}
     
-    # Check IGA folder
-    iga_files = {}
-    iga_path = Path("IGA")
-    if iga_path.exists():
-        # Get files in root IGA folder
-        for csv_file in iga_path.glob("*.csv"):
-            category = csv_file.stem.replace("iga_", "").replace("_", " ").title()
-            iga_files[category] = str(csv_file)
+    for store in ('IGA', 'Woolworths', 'Coles'):
+        store_files = {}
+        if os.path.isdir(store):
+            prefix = f"{store.lower()}_"
+            for file_path in scan_csv_files(store):
+                folder, file_name = os.path.split(file_path)
+                category = file_name[:-len('.csv')].replace(prefix, "").replace("_", " ").title()
+                # Files in subfolders (e.g. IGA's aisle folders) are prefixed with the folder name
+                if folder != store:
+                    subfolder_name = os.path.basename(folder).replace("_", " ").replace(",", " & ").title()
+                    category = f"{subfolder_name} - {category}"
+                store_files[category] = file_path
         
-        # Get files in IGA subfolders
-        for subfolder in iga_path.iterdir():
-            if subfolder.is_dir():
-                subfolder_name = subfolder.name.replace("_", " ").replace(",", " & ").title()
-                for csv_file in subfolder.glob("*.csv"):
-                    category = f"{subfolder_name} - {csv_file.stem.replace('iga_', '').replace('_', ' ').title()}"
-                    iga_files[category] = str(csv_file)
-    
-    csv_files['IGA'] = iga_files
-    
-    # Check Woolworths folder
-    woolworths_files = {}
-    woolworths_path = Path("Woolworths")
-    if woolworths_path.exists():
-        for csv_file in woolworths_path.glob("*.csv"):
-            category = csv_file.stem.replace("woolworths_", "").replace("_", " ").title()
-            woolworths_files[category] = str(csv_file)
-    
-    csv_files['Woolworths'] = woolworths_files
-    
-    # Check Coles folder
-    coles_files = {}
-    coles_path = Path("Coles")
-    if coles_path.exists():
-        for csv_file in coles_path.glob("*.csv"):
-            category = csv_file.stem.replace("coles_", "").replace("_", " ").title()
-            coles_files[category] = str(csv_file)
-    
-    csv_files['Coles'] = coles_files
+        csv_files[store] = store_files
     
     return csv_files
 
-@st.cache_data
-def load_csv_data(file_path: str, store_name: str):
-    """Load and process individual CSV file"""
-    try:
-        df = pd.read_csv(file_path)
-        df['store'] = store_name
-        
-        # Standardize column names based on store
-        if store_name == 'IGA':
-            if 'title' in df.columns:
-                df = df.rename(columns={'title': 'product_name'})
-            if 'productUrl' in df.columns:
-                df = df.rename(columns={'productUrl': 'product_url'})
-            if 'imageUrl' in df.columns:
-                df = df.rename(columns={'imageUrl': 'image_url'})
-                
-        elif store_name == 'Woolworths':
-            if 'title' in df.columns:
-                df = df.rename(columns={'title': 'product_name'})
-            if 'producturl' in df.columns:
-                df = df.rename(columns={'producturl': 'product_url'})
-            if 'imageurl' in df.columns:
-                df = df.rename(columns={'imageurl': 'image_url'})
-                
-        elif store_name == 'Coles':
-            if 'name' in df.columns:
-                df = df.rename(columns={'name': 'product_name'})
-            if 'productURL' in df.columns:
-                df = df.rename(columns={'productURL': 'product_url'})
-            if 'imageURL' in df.columns:
-                df = df.rename(columns={'imageURL': 'image_url'})
-        
-        # Ensure required columns exist
-        required_columns = ['product_name', 'price', 'store']
-        for col in required_columns:
-            if col not in df.columns:
-                if col == 'product_name':
-                    df['product_name'] = df.get('title', df.get('name', 'Unknown Product'))
-                elif col == 'price':
-                    df['price'] = 'Price not available'
-                elif col == 'store':
-                    df['store'] = store_name
-        
-        # Add missing columns with default values
-        if 'brand' not in df.columns:
-            df['brand'] = 'Various'
-        if 'image_url' not in df.columns:
-            df['image_url'] = None
-        if 'product_url' not in df.columns:
-            df['product_url'] = None
-        if 'category' not in df.columns:
-            df['category'] = 'General'
-        
-        # Keep raw price data for display
-        # Create numeric price column for sorting only
-        def extract_numeric_price(price_str):
-            if pd.isna(price_str) or price_str == 'Price not available' or price_str == '':
-                return 0.0  # Default for sorting
-            try:
-                # Extract numeric value from price string for sorting
-                import re
-                # Remove currency symbols and commas, extract numbers
-                cleaned = str(price_str).replace('$', '').replace(',', '').strip()
-                numeric_match = re.search(r'(\d+\.?\d*)', cleaned)
-                if numeric_match:
-                    return float(numeric_match.group(1))
-                return 0.0
-            except (ValueError, AttributeError):
-                return 0.0
-        
-        # Keep original price for display
-        df['price_display'] = df['price']
-        # Create numeric version for sorting only
-        df['price_numeric'] = df['price'].apply(extract_numeric_price)
-        
-        # Don't filter out any rows - show all data as-is
-        
-        return df
-        
-    except Exception as e:
-        st.error(f"Error loading {file_path}: {str(e)}")
-        return pd.DataFrame()
+# Bump when load_csv_data's processing changes so stale Parquet copies are ignored
+PARQUET_CACHE_VERSION = 6
 
-@st.cache_data
-def load_and_process_data():
-    """Load and process all CSV files - kept for backward compatibility"""
-    # This function is kept for any existing functionality that might depend on it
-    # but it will return empty DataFrame since we're moving to category-based loading
-    return pd.DataFrame()
-
-@st.cache_data
-def load_image_from_url(url):
-    """Load image from URL with error handling"""
-    if not url or pd.isna(url):
-        return None
-    
+def write_parquet_cache(df, file_path: str, parquet_path: str):
+    """Atomically write a processed frame next to its CSV, skipping quietly if that fails"""
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, timeout=10, headers=headers)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        return img
-    except Exception as e:
-        return None
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+        os.replace(tmp_path, parquet_path)
+        # Copies written under earlier cache versions are never read again
+        for old_path in glob.glob(f"{glob.escape(file_path)}.v*.parquet"):
+            if old_path != parquet_path:
+                os.remove(old_path)
+    except Exception:
+        # Read-only checkouts still work, they just re-parse the CSV next time
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-def update_live_price(product_url, store, product_name):
-    """Update live price for a specific product"""
-    if not product_url or pd.isna(product_url):
-        return None, "No product URL available"
-    
-    try:
-        with st.spinner(f'Fetching live price for {product_name}...'):
-            result = get_live_price_sync(product_url, store)
-            
-            if result['status'] == 'success':
-                return result['price'], f"✅ Live price updated successfully"
-            else:
-                return None, f"❌ {result['message']}"
-                
-    except Exception as e:
-        return None, f"❌ Error: {str(e)}"
-    except Exception as e:
-        return None, f"❌ Error: {str(e)}"
-
-def create_price_comparison_chart(df):
-    """Create price comparison chart - disabled for raw price data"""
-    # Since we're using raw price strings, charts are not applicable
-    return None
-    
-    fig.update_layout(
-        template='plotly_white',
-        title_font_size=20,
-        xaxis_title_font_size=14,
-        yaxis_title_font_size=14,
-        height=500
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_csv_data(file_path: str, store_name: str, csv_mtime: float):
+    """Load and process individual CSV file, reusing its Parquet copy when up to date.
+    csv_mtime is only a cache key: a rewritten CSV gets a new entry, so caches keyed
+    on it never mix frames from two versions of the file. Load errors propagate
+    so callers can report them; failed loads are not cached"""
+    # Processed frames are saved beside the CSV; one newer than the CSV is reused as-is
+    parquet_path = f"{file_path}.v{PARQUET_CACHE_VERSION}.parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except Exception:
+            # An unreadable copy (damaged, or written by another pyarrow
+            # version) is dropped and rebuilt from the CSV below
+            try:
+                os.remove(parquet_path)
+            except OSError:
+                pass
+    
+    # Peek at the header so only the columns we use get parsed, then read
+    # them with the multithreaded PyArrow parser. Label columns are read as
+    # text even when a file leaves them empty, so their categories survive
+    # the Parquet round trip
+    header = pd.read_csv(file_path, nrows=0).columns
+    df = pd.read_csv(
+        file_path,
+        engine='pyarrow',
+        usecols=[col for col in header if col in SOURCE_COLUMNS],
+        dtype={'brand': str, 'category': str}
     )
+    df['store'] = store_name
+    
+    # Standardize column names based on store
+    df = df.rename(columns=STORE_RENAME.get(store_name, {}))
+    
+    # Add any missing standard columns with their defaults in one step
+    missing_columns = {col: default for col, default in COLUMN_DEFAULTS.items() if col not in df.columns}
+    df = df.assign(**missing_columns)
+    
+    # Low-cardinality labels: group and compare on integer codes, not strings
+    df['store'] = df['store'].astype(STORE_DTYPE)
+    df['brand'] = df['brand'].astype('category')
+    # Sorted brand list for the sidebar, computed once per load; attrs travel
+    # with the frame through st.cache_data and the Parquet copy
+    df.attrs['brands_sorted'] = sorted(df['brand'].cat.categories)
+    df['category'] = df['category'].astype('category')
+    # Arrow-backed strings: name searches run in Arrow's compute kernels, and
+    # the long URL columns are held in Arrow buffers instead of Python objects
+    df = df.astype({
+        'product_name': 'string[pyarrow]',
+        'product_url': 'string[pyarrow]',
+        'image_url': 'string[pyarrow]'
+    })
+    
+    # Keep the original price text for display, dictionary-encoded: prices
+    # repeat heavily, so each distinct string is stored once
+    df['price'] = df['price'].astype('category')
+    # Create numeric version for sorting only: strip currency symbols and
+    # commas, and take the first number. Only the distinct price strings are
+    # parsed, then spread back to the rows through the category codes.
+    # Unpriced rows stay NaN so they sort last instead of posing as $0.00
+    # deals, and stay out of the averages. float32 is plenty for grocery
+    # prices and halves the column's size
+    numeric_text = (
+        df['price'].cat.categories.astype(str).to_series()
+        .str.replace(r'[$,]', '', regex=True)
+        .str.extract(r'(\d+\.?\d*)', expand=False)
+    )
+    parsed = pd.to_numeric(numeric_text, errors='coerce').to_numpy(dtype='float32')
+    # Code -1 (missing price) picks the trailing NaN
+    df['price_numeric'] = np.append(parsed, np.float32('nan'))[df['price'].cat.codes.to_numpy()]
+    
+    # Don't filter out any rows - show all data as-is
     
-    return fig
+    write_parquet_cache(df, file_path, parquet_path)
+    return df
 
-def create_product_count_chart(df):
-    """Create product count chart"""
-    if df.empty:
-        return None
+def update_live_prices(products):
+    """Update live prices for several products concurrently, returning {product_url: result}"""
+    targets = [
+        (product_url, str(store))
+        for product_url, store in zip(products['product_url'], products['store'])
+        if pd.notna(product_url) and product_url
+    ]
+    if not targets:
+        return {}
+    
+    with st.spinner(f'Fetching live prices for {len(targets)} products...'):
+        try:
+            setup_playwright().result()
+        except Exception as e:
+            # Forget the failed install so the next update tries again
+            setup_playwright.clear()
+            st.warning(f"Could not install browsers: {e}")
+            return {}
         
-    product_counts = df['store'].value_counts().reset_index()
-    product_counts.columns = ['store', 'count']
-    
-    fig = px.pie(product_counts, values='count', names='store',
-                 title='Number of Coca-Cola Products by Store',
-                 color_discrete_map={
-                     'Coles': '#E50000',
-                     'IGA': '#00A651', 
-                     'Woolworths': '#FF6B35'
-                 })
-    
-    fig.update_layout(
-        template='plotly_white',
-        title_font_size=20,
-        height=500
-    )
+        results = get_live_prices_sync(targets)
     
-    return fig
+    return {product_url: result for (product_url, _), result in zip(targets, results)}
 
-def create_price_distribution_chart(df):
-    """Create price distribution chart"""
-    if df.empty:
-        return None
-        
-    fig = px.box(df, x='store', y='price_numeric',
-                 title='Price Distribution by Store',
-                 labels={'price_numeric': 'Price ($)', 'store': 'Store'},
-                 color='store',
-                 color_discrete_map={
-                     'Coles': '#E50000',
-                     'IGA': '#00A651', 
-                     'Woolworths': '#FF6B35'
-                 })
-    
-    fig.update_layout(
-        template='plotly_white',
-        title_font_size=20,
-        xaxis_title_font_size=14,
-        yaxis_title_font_size=14,
-        height=500
-    )
+# Sort choices offered above the product list: (column, ascending)
+SORT_OPTIONS = {
+    'Price (Low to High)': ('price_numeric', True),
+    'Price (High to Low)': ('price_numeric', False),
+    'Product Name': ('product_name', True),
+    'Brand': ('brand', True)
+}
+
+def sort_positions(df, column, ascending=True):
+    """Row positions ordering df by one column via a NumPy argsort on that column alone, missing values last"""
+    values = df[column]
+    if pd.api.types.is_numeric_dtype(values):
+        keys = values.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        # Rank labels (strings, categories) by their sorted factor codes
+        codes, _ = pd.factorize(values, sort=True)
+        keys = np.where(codes < 0, np.nan, codes)
+    if not ascending:
+        keys = -keys
+    return np.argsort(keys, kind='stable')
+
+@st.cache_data(show_spinner=False)
+def sort_order(file_path: str, store_name: str, csv_mtime: float, sort_by: str):
+    """Positions of a CSV's full frame in the given SORT_OPTIONS order, sorted once per CSV version"""
+    column, ascending = SORT_OPTIONS[sort_by]
+    return sort_positions(load_csv_data(file_path, store_name, csv_mtime), column, ascending)
+
+# Markup for one product card; render_product_card fills in the row's pieces
+CARD_TEMPLATE = (
+    "<div class='product-card'>"
+    "<div class='product-image'>{image}</div>"
+    "<div class='product-info'>{info}</div>"
+    "<div class='product-price'>{price}</div>"
+    "<div class='product-link'>{link}</div>"
+    "</div>"
+)
+
+def render_product_card(product, live_prices):
+    """Build the HTML for one product card from an itertuples() row"""
+    product_url = product.product_url
+    has_url = pd.notna(product_url) and bool(product_url)
+    url = html.escape(str(product_url)) if has_url else None
+    name = html.escape(str(product.product_name))
+    
+    # Image (clickable if URL is present); the browser fetches thumbnails in
+    # parallel, deferring off-screen ones and decoding off the main thread
+    if pd.notna(product.image_url) and product.image_url:
+        image = f"<img src='{html.escape(str(product.image_url))}' width='100' loading='lazy' decoding='async' style='border-radius:8px' />"
+        if has_url:
+            image = f"<a href='{url}' target='_blank'>{image}</a>"
+    else:
+        image = "🖼️ No Image"
+    
+    # Clickable product name, then brand and category if available
+    if has_url:
+        info = f"<a href='{url}' target='_blank' style='text-decoration:none; color:inherit;'><h4>{name}</h4></a>"
+    else:
+        info = f"<h4>{name}</h4>"
+    if pd.notna(product.brand):
+        info += f"<p><b>Brand:</b> {html.escape(str(product.brand))}</p>"
+    if pd.notna(product.category):
+        info += f"<p><b>Category:</b> {html.escape(str(product.category))}</p>"
     
-    return fig
+    # Store badge
+    info += BADGE_HTML[product.store]
+    
+    # Raw CSV price, plus the live price from the last bulk update if any
+    price = product.price if pd.notna(product.price) else COLUMN_DEFAULTS['price']
+    price_html = f"<div>Price</div><div class='price-value'>{html.escape(str(price))}</div>"
+    if has_url and product_url in live_prices:
+        price_html += f"<div class='live-price'>Live: {html.escape(str(live_prices[product_url]))}</div>"
+    
+    # Product URL link
+    link = f"<a href='{url}' target='_blank'>🔗 View Product</a>" if has_url else "No URL available"
+    
+    return CARD_TEMPLATE.format(image=image, info=info, price=price_html, link=link)
+
+@st.cache_data(show_spinner=False)
+def summarize_category(file_path: str, store_name: str, csv_mtime: float):
+    """Compute the Category Summary metrics once per CSV version"""
+    df = load_csv_data(file_path, store_name, csv_mtime)
+    prices = df['price']
+    
+    sample_text = ", ".join(str(p) for p in prices.head(3))
+    if len(sample_text) > 20:
+        sample_text = sample_text[:20] + "..."
+    
+    return {
+        'total_products': len(df),
+        'sample_prices': sample_text,
+        # Counted on the category codes, not the price strings
+        'unique_prices': prices.nunique()
+    }
 
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    """Shared worker pool for background CSV prefetching"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="csv-prefetch")
+
+def prefetch_store_categories(store: str, store_files: dict):
+    """Warm load_csv_data's cache for a store's categories in the background, once per session"""
+    prefetched = st.session_state.setdefault('prefetched', set())
+    executor = get_executor()
+    for file_path in store_files.values():
+        if file_path not in prefetched:
+            executor.submit(load_csv_data, file_path, store, os.path.getmtime(file_path))
+            prefetched.add(file_path)
+
+def install_chromium_if_missing():
+    """Run `playwright install chromium` unless Playwright's Chromium executable is already present"""
+    from playwright.sync_api import sync_playwright
+    
+    # Ask Playwright where its Chromium lives instead of assuming a folder layout,
+    # which changes between releases
+    with sync_playwright() as p:
+        if os.path.exists(p.chromium.executable_path):
+            return
+    subprocess.run(["playwright", "install", "chromium"], check=True)
+
+@st.cache_resource(show_spinner=False)
 def setup_playwright():
-    """Install Playwright browsers if not available"""
-    try:
-        if not os.path.exists("/home/appuser/.cache/ms-playwright"):
-            subprocess.run(["playwright", "install", "firefox"], check=False)
-            subprocess.run(["playwright", "install", "chromium"], check=False)
-    except Exception as e:
-        st.warning(f"Could not install browsers: {e}")
+    """Check for and, if needed, install Playwright's Chromium in the background - returns the Future"""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playwright-install")
+    install = executor.submit(install_chromium_if_missing)
+    executor.shutdown(wait=False)
+    return install
 
 def main():
     setup_playwright()
+    # Styles must be re-sent every run: Streamlit drops elements a rerun doesn't emit
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    
     # Header
     st.markdown("""
     <div class="main-header">
@@ -342,14 +452,27 @@ def main():
     
     # Load data for selected store and category
     csv_file_path = csv_files[selected_store][selected_category]
+    # Keys every cache derived from this CSV, so a rewritten file is never
+    # paired with sort orders or filter masks computed from the old one
+    csv_mtime = os.path.getmtime(csv_file_path)
     
     with st.spinner(f'Loading {selected_category} products from {selected_store}...'):
-        df = load_csv_data(csv_file_path, selected_store)
+        # Load errors are reported here rather than inside the cached loader,
+        # which also runs on the background prefetch threads
+        try:
+            df = load_csv_data(csv_file_path, selected_store, csv_mtime)
+        except Exception as e:
+            st.error(f"Error loading {csv_file_path}: {str(e)}")
+            df = pd.DataFrame()
     
     if df.empty:
         st.error(f"No data could be loaded from {csv_file_path}")
         st.stop()
     
+    # Load the store's other categories while this one renders so switching is instant
+    st.session_state.setdefault('prefetched', set()).add(csv_file_path)
+    prefetch_store_categories(selected_store, csv_files[selected_store])
+    
     # Display current selection info
     st.info(f"📋 Showing **{len(df)}** products from **{selected_store} - {selected_category}**")
     
@@ -358,35 +481,58 @@ def main():
     search_term = st.sidebar.text_input('Search Products:', placeholder='Enter product name...')
     
     # Brand filter (if available)
-    if 'brand' in df.columns and not df['brand'].isna().all():
-        available_brands = ['All'] + sorted(df['brand'].dropna().unique().tolist())
+    brands = df.attrs.get('brands_sorted', [])
+    if brands:
+        available_brands = ['All'] + list(brands)
         selected_brand = st.sidebar.selectbox('Select Brand:', available_brands)
     else:
         selected_brand = 'All'
     
-    # Apply filters
-    filtered_df = df.copy()
-    
-    # Skip price filter - using raw price data
-    
-    # Apply search filter
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df['product_name'].str.contains(search_term, case=False, na=False)
-        ]
-    
-    # Apply brand filter
-    if selected_brand != 'All':
-        filtered_df = filtered_df[filtered_df['brand'] == selected_brand]
+    # Reuse the filter mask from the last run when only sorting or paging changed
+    filter_key = (csv_file_path, csv_mtime, search_term, selected_brand)
+    if st.session_state.get('filter_key') == filter_key:
+        matches = st.session_state['filter_mask']
+    else:
+        # Combine the filters into one boolean mask; None means every row matches
+        masks = []
+        
+        # Skip price filter - using raw price data
+        
+        # Search filter - a literal, case-insensitive substring match (Arrow's
+        # match_substring), so no regex is compiled or run per keystroke
+        if search_term:
+            masks.append(
+                df['product_name'].str.contains(search_term, case=False, regex=False, na=False)
+                .to_numpy(dtype=bool)
+            )
+        
+        # Brand filter
+        if selected_brand != 'All':
+            masks.append((df['brand'] == selected_brand).to_numpy(dtype=bool))
+        
+        matches = np.logical_and.reduce(masks) if masks else None
+        
+        st.session_state['filter_key'] = filter_key
+        st.session_state['filter_mask'] = matches
     
     # Products section with pagination
     st.header("🛍️ Products")
     
-    if not filtered_df.empty:
+    if matches is None or matches.any():
+        # Sort options - the whole filtered set is ordered before it is paged.
+        # The full frame's order is sorted once per CSV and cached; keeping just
+        # the matching positions of a stable order gives the filtered order, so
+        # changing filters or sort never re-sorts
+        sort_by = st.selectbox('Sort by:', list(SORT_OPTIONS))
+        order = sort_order(csv_file_path, selected_store, csv_mtime, sort_by)
+        if matches is not None:
+            order = order[matches[order]]
+        filtered_df = df.iloc[order]
+        
         # Pagination setup
         products_per_page = 30
         total_products = len(filtered_df)
-        total_pages = math.ceil(total_products / products_per_page)
+        total_pages = -(-total_products // products_per_page)
         
         # Page selection
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -405,100 +551,52 @@ def main():
         start_idx = (current_page - 1) * products_per_page
         end_idx = min(start_idx + products_per_page, total_products)
         
-        # Get products for current page
-        page_df = filtered_df.iloc[start_idx:end_idx].reset_index(drop=True)
-        
-        # Sort options
-        sort_options = ['Price (Low to High)', 'Price (High to Low)', 'Product Name', 'Brand']
-        sort_by = st.selectbox('Sort by:', sort_options)
-        
-        if sort_by == 'Price (Low to High)':
-            page_df = page_df.sort_values('price_numeric')
-        elif sort_by == 'Price (High to Low)':
-            page_df = page_df.sort_values('price_numeric', ascending=False)
-        elif sort_by == 'Product Name':
-            page_df = page_df.sort_values('product_name')
-        elif sort_by == 'Brand':
-            page_df = page_df.sort_values('brand')
+        # Get products for current page; a positional slice, no reindexed copy
+        page_df = filtered_df.iloc[start_idx:end_idx]
         
         # Display pagination info
         st.caption(f"Showing products {start_idx + 1}-{end_idx} of {total_products}")
         
-        # Display products
-        for idx, product in page_df.iterrows():
-            with st.container():
-                col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
-                
-                with col1:
-                    # Display image (clickable if URL is present)
-                    if pd.notna(product.get('image_url')) and product.get('image_url'):
-                        if product.get('product_url'):
-                            st.markdown(
-                                f"<a href='{product['product_url']}' target='_blank'><img src='{product['image_url']}' width='100' style='border-radius:8px' /></a>",
-                                unsafe_allow_html=True
-                            )
-                        else:
-                            st.image(product['image_url'], width=100)
-                    else:
-                        st.write("🖼️ No Image")
-                
-                with col2:
-                    # Clickable product name
-                    if product.get('product_url'):
-                        st.markdown(
-                            f"<a href='{product['product_url']}' target='_blank' style='text-decoration:none; color:inherit;'><h4 style='margin:0'>{product['product_name']}</h4></a>",
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        st.subheader(product['product_name'])
-                    
-                    # Show brand and category if available
-                    if pd.notna(product.get('brand')):
-                        st.write(f"**Brand:** {product['brand']}")
-                    if pd.notna(product.get('category')):
-                        st.write(f"**Category:** {product['category']}")
-                    
-                    # Store badge
-                    store_colors = {
-                        'Coles': '#E50000',
-                        'IGA': '#00A651',
-                        'Woolworths': '#FF6B35'
-                    }
-                    st.markdown(
-                        f"<span style='background-color: {store_colors[product['store']]}; "
-                        f"color: white; padding: 0.25rem 0.75rem; border-radius: 15px; "
-                        f"font-size: 0.8rem; font-weight: bold;'>{product['store']}</span>",
-                        unsafe_allow_html=True
-                    )
-                
-                with col3:
-                    # Always show raw CSV price - no session state caching
-                    st.metric("Price", product['price'])
-                
-                with col4:
-                    # Live price update button - shows result temporarily
-                    if product.get('product_url') and not pd.isna(product.get('product_url')):
-                        button_key = f"update_{start_idx + idx}"
-                        if st.button("🔄 Update Price", key=button_key, help=f"Get live price for {product['product_name']}"):
-                            # Update live price and show result
-                            live_price, status_message = update_live_price(
-                                product['product_url'], 
-                                product['store'], 
-                                product['product_name']
-                            )
-                            
-                            if live_price is not None:
-                                st.success(f"Live Price: {live_price}")
-                            else:
-                                st.error(status_message)
-                    else:
-                        # Product URL link
-                        if product.get('product_url') and not pd.isna(product.get('product_url')):
-                            st.markdown(f"[🔗 View Product]({product['product_url']})")
-                        else:
-                            st.caption("No URL available")
-                
-                st.divider()
+        # Live price updates for selected products or the whole page, scraped concurrently
+        live_prices = st.session_state.setdefault('live_prices', {})
+        updatable_df = page_df[page_df['product_url'].notna()]
+        selected_rows = st.multiselect(
+            'Select products to update:',
+            updatable_df.index.tolist(),
+            format_func=lambda row: updatable_df.at[row, 'product_name'],
+            placeholder='Choose products for a live price check...'
+        )
+        
+        col1, col2, col3 = st.columns([1, 1, 3])
+        with col1:
+            update_selected = st.button("🔄 Update Selected", disabled=not selected_rows,
+                                        help="Get live prices for the selected products")
+        with col2:
+            update_all = st.button("🔄 Update All Prices", help="Get live prices for every product on this page")
+        with col3:
+            if st.button("♻️ Force Refresh", help="Forget live prices fetched in the last 5 minutes"):
+                clear_price_cache()
+                st.toast("Live price cache cleared")
+        
+        if update_selected or update_all:
+            results = update_live_prices(updatable_df.loc[selected_rows] if update_selected else updatable_df)
+            names = dict(zip(updatable_df['product_url'], updatable_df['product_name']))
+            updated = 0
+            failures = []
+            for product_url, result in results.items():
+                if result['status'] == 'success':
+                    live_prices[product_url] = result['price']
+                    updated += 1
+                else:
+                    failures.append(f"- **{names.get(product_url, product_url)}**: {result['message']}")
+            if results:
+                st.toast(f"Updated {updated} of {len(results)} live prices")
+            if failures:
+                st.warning("Could not get live prices for:\n" + "\n".join(failures))
+        
+        # Display products as a single HTML payload instead of one set of widgets per row
+        cards = "".join(render_product_card(product, live_prices) for product in page_df.itertuples(index=False))
+        st.markdown(f"<div>{cards}</div>", unsafe_allow_html=True)
         
         # Pagination navigation at bottom
         if total_pages > 1:
@@ -528,10 +626,11 @@ def main():
         st.markdown("---")
         st.header("📊 Category Summary")
         
+        summary = summarize_category(csv_file_path, selected_store, csv_mtime)
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Products", len(df))
+            st.metric("Total Products", summary['total_products'])
         
         with col2:
             # Show raw price data - no calculations since prices are strings
@@ -539,22 +638,11 @@ def main():
         
         with col3:
             # Display sample of price range from data
-            if not df.empty:
-                sample_prices = df['price'].head(3).tolist()
-                sample_text = ", ".join([str(p) for p in sample_prices])
-                if len(sample_text) > 20:
-                    sample_text = sample_text[:20] + "..."
-                st.metric("Sample Prices", sample_text)
-            else:
-                st.metric("Sample Prices", "N/A")
+            st.metric("Sample Prices", summary['sample_prices'])
         
         with col4:
             # Show total unique prices
-            if not df.empty:
-                unique_prices = df['price'].nunique()
-                st.metric("Unique Prices", unique_prices)
-            else:
-                st.metric("Unique Prices", "N/A")
+            st.metric("Unique Prices", summary['unique_prices'])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file